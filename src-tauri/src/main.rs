@@ -1,9 +1,9 @@
 #![cfg_attr(not(debug_assertions), windows_subsystem = "windows")]
 
 use std::io::{BufRead, BufReader};
-use std::process::{Child, Command, Stdio};
+use std::process::{Child, ChildStdout, Command, Stdio};
 use std::sync::Mutex;
-use std::time::Duration;
+use std::time::{Duration, Instant};
 use tauri::Emitter;
 use tauri::Manager; // for app.path()
 
@@ -13,6 +13,36 @@ use std::os::unix::process::CommandExt;
 // Global storage for Python child process to enable cleanup on exit
 static PYTHON_CHILD: Mutex<Option<Child>> = Mutex::new(None);
 
+// Upper bound on lines forwarded in a single "python-lines" event
+const MAX_LINES_PER_EMIT: usize = 64;
+
+// Forward sidecar stdout to the frontend. Lines that are already buffered when a read
+// returns are emitted together, so a high-rate pose stream costs one IPC event per burst
+// instead of one per line; a lone line is still emitted as soon as it arrives.
+fn forward_stdout_lines(app: tauri::AppHandle, stdout: ChildStdout) {
+    std::thread::spawn(move || {
+        let mut reader = BufReader::new(stdout);
+        let mut line = String::new();
+        let mut batch: Vec<String> = Vec::new();
+        loop {
+            line.clear();
+            match reader.read_line(&mut line) {
+                Ok(0) => break,
+                Ok(_) => batch.push(line.trim_end_matches(&['\r', '\n'][..]).to_string()),
+                // Skip lines that are not valid UTF-8 (same as BufRead::lines)
+                Err(e) if e.kind() == std::io::ErrorKind::InvalidData => {}
+                Err(_) => break,
+            }
+            if !batch.is_empty() && (reader.buffer().is_empty() || batch.len() >= MAX_LINES_PER_EMIT) {
+                let _ = app.emit("python-lines", std::mem::take(&mut batch));
+            }
+        }
+        if !batch.is_empty() {
+            let _ = app.emit("python-lines", batch);
+        }
+    });
+}
+
 // simple recursive copy helper for bootstrapping runtime python from resources
 fn copy_dir_all(src: &std::path::Path, dst: &std::path::Path) -> std::io::Result<()> {
     if !src.exists() {
@@ -60,6 +90,96 @@ struct StartConfig {
     rate_limit_hz: Option<f64>,
 }
 
+// Append `-m televoodoo` and the CLI flags derived from the start config
+fn add_televoodoo_args(cmd: &mut Command, config: &StartConfig) {
+    cmd.arg("-m").arg("televoodoo")
+        .arg("--connection").arg(&config.connection);
+
+    // Add optional name and code
+    if let Some(ref name) = config.name {
+        cmd.arg("--name").arg(name);
+    }
+    if let Some(ref code) = config.code {
+        cmd.arg("--code").arg(code);
+    }
+    // Add optional upsampling and rate limiting
+    if let Some(hz) = config.upsample_hz {
+        cmd.arg("--upsample-hz").arg(hz.to_string());
+    }
+    if let Some(hz) = config.rate_limit_hz {
+        cmd.arg("--rate-limit-hz").arg(hz.to_string());
+    }
+}
+
+// Install pyobjc into the interpreter that will run the sidecar if it cannot be imported
+#[cfg(target_os = "macos")]
+fn ensure_pyobjc(cmd: &Command) {
+    let cwd = cmd.get_current_dir().unwrap_or_else(|| std::path::Path::new("."));
+    if let Ok(status) = Command::new(cmd.get_program())
+        .args(["-c", "import objc"]) // simple import test
+        .current_dir(cwd)
+        .status()
+    {
+        if !status.success() {
+            let _ = Command::new(cmd.get_program())
+                .args(["-m", "pip", "install", "pyobjc"])
+                .current_dir(cwd)
+                .status();
+        }
+    }
+}
+
+// Spawn the sidecar, register it for cleanup on exit and forward its stdout/stderr
+fn spawn_sidecar(app: &tauri::AppHandle, mut cmd: Command) -> Result<(), String> {
+    // On Unix, create new process group for cleaner termination
+    #[cfg(unix)]
+    unsafe {
+        cmd.pre_exec(|| {
+            // Create new process group with this process as leader
+            libc::setpgid(0, 0);
+            Ok(())
+        });
+    }
+
+    let mut child = cmd
+        .stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .spawn()
+        .map_err(|e| e.to_string())?;
+
+    // take pipes before moving child into threads
+    let stdout = child.stdout.take();
+    let stderr = child.stderr.take();
+
+    // Store child process for cleanup on exit
+    if let Ok(mut guard) = PYTHON_CHILD.lock() {
+        // Kill any existing Python process first
+        if let Some(mut old_child) = guard.take() {
+            let _ = old_child.kill();
+        }
+        *guard = Some(child);
+    }
+
+    if let Some(stdout) = stdout {
+        forward_stdout_lines(app.clone(), stdout);
+    }
+
+    // forward stderr too
+    let app_handle_err = app.clone();
+    std::thread::spawn(move || {
+        if let Some(stderr) = stderr {
+            let reader = BufReader::new(stderr);
+            for line in reader.lines() {
+                if let Ok(line) = line {
+                    let _ = app_handle_err.emit("python-error", line);
+                }
+            }
+        }
+    });
+
+    Ok(())
+}
+
 #[tauri::command]
 async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(), String> {
     // In dev builds, run directly from the repo's python dir and venv
@@ -88,42 +208,13 @@ async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(),
         }
 
         let mut cmd = Command::new(&python);
-        cmd.arg("-m").arg("televoodoo")
-            .arg("--connection").arg(&config.connection)
-            .current_dir(&televoodoo_dir)
+        add_televoodoo_args(&mut cmd, &config);
+        cmd.current_dir(&televoodoo_dir)
             .env("PYTHONPATH", televoodoo_src.to_string_lossy().to_string());
-        
-        // Add optional name and code
-        if let Some(ref name) = config.name {
-            cmd.arg("--name").arg(name);
-        }
-        if let Some(ref code) = config.code {
-            cmd.arg("--code").arg(code);
-        }
-        // Add optional upsampling and rate limiting
-        if let Some(hz) = config.upsample_hz {
-            cmd.arg("--upsample-hz").arg(hz.to_string());
-        }
-        if let Some(hz) = config.rate_limit_hz {
-            cmd.arg("--rate-limit-hz").arg(hz.to_string());
-        }
 
         // Ensure pyobjc on macOS for dev
         #[cfg(target_os = "macos")]
-        {
-            if let Ok(status) = Command::new(&cmd.get_program())
-                .args(["-c", "import objc"]) // simple import test
-                .current_dir(cmd.get_current_dir().unwrap_or_else(|| std::path::Path::new(".")))
-                .status()
-            {
-                if !status.success() {
-                    let _ = Command::new(&cmd.get_program())
-                        .args(["-m", "pip", "install", "pyobjc"])
-                        .current_dir(cmd.get_current_dir().unwrap_or_else(|| std::path::Path::new(".")))
-                        .status();
-                }
-            }
-        }
+        ensure_pyobjc(&cmd);
 
         // AppImage and some launchers may inject Python-related env vars that break venvs.
         // For dev, we KEEP PYTHONPATH (we set it above) but sanitize the rest.
@@ -132,69 +223,23 @@ async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(),
             .env_remove("PYTHONUSERBASE")
             .env("PYTHONUNBUFFERED", "1");
 
-        // On Unix, create new process group for cleaner termination
-        #[cfg(unix)]
-        unsafe {
-            cmd.pre_exec(|| {
-                // Create new process group with this process as leader
-                libc::setpgid(0, 0);
-                Ok(())
-            });
-        }
-
-        let mut child = cmd
-            .stdout(Stdio::piped())
-            .stderr(Stdio::piped())
-            .spawn()
-            .map_err(|e| e.to_string())?;
-
-        let stdout = child.stdout.take();
-        let stderr = child.stderr.take();
-        
-        // Store child process for cleanup on exit
-        if let Ok(mut guard) = PYTHON_CHILD.lock() {
-            // Kill any existing Python process first
-            if let Some(mut old_child) = guard.take() {
-                let _ = old_child.kill();
-            }
-            *guard = Some(child);
-        }
-        
-        let app_handle = app.clone();
-        std::thread::spawn(move || {
-            if let Some(stdout) = stdout {
-                let reader = BufReader::new(stdout);
-                for line in reader.lines() {
-                    if let Ok(line) = line {
-                        let _ = app_handle.emit("python-line", line);
-                    }
-                }
-            }
-        });
-        let app_handle_err = app.clone();
-        std::thread::spawn(move || {
-            if let Some(stderr) = stderr {
-                let reader = BufReader::new(stderr);
-                for line in reader.lines() {
-                    if let Ok(line) = line {
-                        let _ = app_handle_err.emit("python-error", line);
-                    }
-                }
-            }
-        });
-        return Ok(());
+        return spawn_sidecar(&app, cmd);
     }
 
+    // Resolve both candidate locations once; they are needed for bootstrapping and for the working dir
+    let bundled_py = find_bundled_python_dir(&app);
+    let app_data_dir = app.path().app_data_dir().ok();
+
     // Always prefer a runtime venv under App Support and bootstrap it from bundled Resources if missing.
     let mut python = "python3".to_string();
-    if let Ok(app_data_dir) = app.path().app_data_dir() {
+    if let Some(ref app_data_dir) = app_data_dir {
         let runtime_py_dir = app_data_dir.join("python");
         let runtime_venv_bin = runtime_py_dir.join(".venv").join("bin");
         let runtime_python = runtime_venv_bin.join("python");
         let runtime_pip = runtime_venv_bin.join("pip");
 
         if !runtime_python.exists() {
-            if let Some(bundled) = find_bundled_python_dir(&app) {
+            if let Some(ref bundled) = bundled_py {
                 let televoodoo_dir = bundled.join("televoodoo");
                 let pyproject = televoodoo_dir.join("pyproject.toml");
                 if pyproject.exists() {
@@ -219,31 +264,15 @@ async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(),
     }
 
     let mut cmd = Command::new(python);
-    cmd.arg("-m").arg("televoodoo")
-        .arg("--connection").arg(&config.connection);
-    
-    // Add optional name and code
-    if let Some(ref name) = config.name {
-        cmd.arg("--name").arg(name);
-    }
-    if let Some(ref code) = config.code {
-        cmd.arg("--code").arg(code);
-    }
-    // Add optional upsampling and rate limiting
-    if let Some(hz) = config.upsample_hz {
-        cmd.arg("--upsample-hz").arg(hz.to_string());
-    }
-    if let Some(hz) = config.rate_limit_hz {
-        cmd.arg("--rate-limit-hz").arg(hz.to_string());
-    }
+    add_televoodoo_args(&mut cmd, &config);
 
     // Packaged: prefer bundled Resources/python/televoodoo, else runtime app_data/python/televoodoo
-    if let Some(bundled_py) = find_bundled_python_dir(&app) {
+    if let Some(ref bundled_py) = bundled_py {
         let televoodoo_bundled = bundled_py.join("televoodoo");
         if televoodoo_bundled.join("pyproject.toml").exists() {
             cmd.current_dir(&televoodoo_bundled);
         }
-    } else if let Ok(app_data_dir) = app.path().app_data_dir() {
+    } else if let Some(ref app_data_dir) = app_data_dir {
         let televoodoo_runtime = app_data_dir.join("python").join("televoodoo");
         if televoodoo_runtime.join("pyproject.toml").exists() {
             cmd.current_dir(&televoodoo_runtime);
@@ -252,20 +281,7 @@ async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(),
 
     // Only ensure pyobjc on macOS; Linux must not try to install it
     #[cfg(target_os = "macos")]
-    {
-        if let Ok(status) = Command::new(&cmd.get_program())
-            .args(["-c", "import objc"]) // simple import test
-            .current_dir(cmd.get_current_dir().unwrap_or_else(|| std::path::Path::new(".")))
-            .status()
-        {
-            if !status.success() {
-                let _ = Command::new(&cmd.get_program())
-                    .args(["-m", "pip", "install", "pyobjc"])
-                    .current_dir(cmd.get_current_dir().unwrap_or_else(|| std::path::Path::new(".")))
-                    .status();
-            }
-        }
-    }
+    ensure_pyobjc(&cmd);
 
     // Clean up Python-related env vars that AppImage sets (PYTHONHOME, PYTHONPATH, ...)
     cmd.env_remove("PYTHONHOME")
@@ -274,61 +290,7 @@ async fn start_python(app: tauri::AppHandle, config: StartConfig) -> Result<(),
         .env_remove("PYTHONUSERBASE")
         .env("PYTHONUNBUFFERED", "1");
 
-    // On Unix, create new process group for cleaner termination
-    #[cfg(unix)]
-    unsafe {
-        cmd.pre_exec(|| {
-            // Create new process group with this process as leader
-            libc::setpgid(0, 0);
-            Ok(())
-        });
-    }
-
-    let mut child = cmd
-        .stdout(Stdio::piped())
-        .stderr(Stdio::piped())
-        .spawn()
-        .map_err(|e| e.to_string())?;
-
-    // take pipes before moving child into threads
-    let stdout = child.stdout.take();
-    let stderr = child.stderr.take();
-
-    // Store child process for cleanup on exit
-    if let Ok(mut guard) = PYTHON_CHILD.lock() {
-        // Kill any existing Python process first
-        if let Some(mut old_child) = guard.take() {
-            let _ = old_child.kill();
-        }
-        *guard = Some(child);
-    }
-
-    let app_handle = app.clone();
-    std::thread::spawn(move || {
-        if let Some(stdout) = stdout {
-            let reader = BufReader::new(stdout);
-            for line in reader.lines() {
-                if let Ok(line) = line {
-                    let _ = app_handle.emit("python-line", line);
-                }
-            }
-        }
-    });
-
-    // forward stderr too
-    let app_handle_err = app.clone();
-    std::thread::spawn(move || {
-        if let Some(stderr) = stderr {
-            let reader = BufReader::new(stderr);
-            for line in reader.lines() {
-                if let Ok(line) = line {
-                    let _ = app_handle_err.emit("python-error", line);
-                }
-            }
-        }
-    });
-
-    Ok(())
+    spawn_sidecar(&app, cmd)
 }
 
 #[tauri::command]
@@ -350,8 +312,12 @@ fn cleanup_python() {
                 // First try SIGTERM for graceful shutdown
                 unsafe { libc::kill(pid_i32, libc::SIGTERM); }
                 
-                // Give it a moment to respond gracefully
-                std::thread::sleep(Duration::from_millis(200));
+                // Give it a moment to respond gracefully, but stop waiting as soon as
+                // it has exited rather than always sleeping out the whole grace period
+                let deadline = Instant::now() + Duration::from_millis(200);
+                while matches!(child.try_wait(), Ok(None)) && Instant::now() < deadline {
+                    std::thread::sleep(Duration::from_millis(10));
+                }
                 
                 // Check if it exited
                 match child.try_wait() {
@@ -1,15 +1,33 @@
 import { invoke } from '@tauri-apps/api/core';
 import { listen } from '@tauri-apps/api/event';
 import { connectionStatus, connectionType, outputJson, connectionName, accessCode, wifiIp, wifiPort, inputPose, originPose, outputConfig, serviceState, type ConnectionType, type ServiceConfig } from './store';
-import { computeOutput } from './transform';
+import { computeOutput, type OutputPayload } from './transform';
 import { log } from './log';
+import type { OutputConfig, Pose } from './types';
+
+// Used until the output settings panel publishes a config; built once instead of per pose
+const DEFAULT_OUTPUT_CONFIG: OutputConfig = {
+  includeFormats: { absolute_input: true, absolute_transformed: true, delta_input: false, delta_transformed: false },
+  includeOrientation: { quaternion: true, euler_radian: false, euler_degree: false },
+  scale: 1,
+  outputAxes: { x: 1, y: 1, z: 1 }
+};
 
 let currentStatus: 'disconnected' | 'connecting' | 'connected' = 'disconnected';
+// Monotonic (performance.now()) so wall-clock adjustments cannot fake or hide a timeout; 0 = no activity yet
 let lastActivityMs = 0;
 let inactivityTimer: number | null = null;
+const INACTIVITY_TIMEOUT_MS = 10_000;
 let unlistenStdout: (() => void) | null = null;
 let unlistenStderr: (() => void) | null = null;
 
+// Latest origin and output config, kept current by long-lived subscriptions so the
+// pose path reads a plain reference instead of subscribing/unsubscribing per message
+let currentOrigin: Pose | null = null;
+let currentConfig: OutputConfig | null = null;
+originPose.subscribe((v) => (currentOrigin = v));
+outputConfig.subscribe((v) => (currentConfig = v));
+
 function setStatus(next: 'disconnected' | 'connecting' | 'connected') {
   if (currentStatus === next) return;
   currentStatus = next;
@@ -17,8 +35,80 @@ function setStatus(next: 'disconnected' | 'connecting' | 'connected') {
   log('info', `Connection status -> ${next}`);
 }
 
-function processMessage(msg: any) {
-  if (msg.type === 'session') {
+// Instead of polling, the watchdog sleeps until the current activity deadline and
+// re-arms from there; activity in between just moves the deadline it will find
+function checkInactivity() {
+  let delay = INACTIVITY_TIMEOUT_MS;
+  if (lastActivityMs !== 0) { // never connected yet
+    const remaining = lastActivityMs + INACTIVITY_TIMEOUT_MS - performance.now();
+    if (remaining > 0) {
+      delay = remaining;
+    } else if (currentStatus !== 'disconnected') {
+      setStatus('disconnected');
+    }
+  }
+  inactivityTimer = setTimeout(checkInactivity, delay) as unknown as number;
+}
+
+// Latest-value mailbox for the display stores: poses can arrive faster than the screen
+// refreshes, so only the newest input/output pair is published, once per animation frame.
+// Origin tracking still runs for every pose.
+let pendingInputPose: Pose | null = null;
+let pendingOutput: OutputPayload | null = null;
+let publishScheduled = false;
+
+function publishLatestPose() {
+  publishScheduled = false;
+  if (pendingInputPose) inputPose.set(pendingInputPose);
+  if (pendingOutput) outputJson.set(pendingOutput);
+  pendingInputPose = null;
+  pendingOutput = null;
+}
+
+function processPose(msg: any) {
+  try {
+    const ai = msg.data?.absolute_input;
+    if (ai) {
+      const pose = {
+        movement_start: !!ai.movement_start,
+        x: Number(ai.x ?? 0),
+        y: Number(ai.y ?? 0),
+        z: Number(ai.z ?? 0),
+        x_rot: Number(ai.x_rot ?? 0),
+        y_rot: Number(ai.y_rot ?? 0),
+        z_rot: Number(ai.z_rot ?? 0),
+        qx: Number(ai.qx ?? 0),
+        qy: Number(ai.qy ?? 0),
+        qz: Number(ai.qz ?? 0),
+        qw: Number(ai.qw ?? 1)
+      };
+      const { output, newOrigin } = computeOutput(pose, currentConfig ?? DEFAULT_OUTPUT_CONFIG, currentOrigin);
+      if (newOrigin !== currentOrigin) originPose.set(newOrigin);
+      // INPUT pose is in reference coordinate system (equals visualization world)
+      pendingInputPose = pose;
+      pendingOutput = output;
+      if (!publishScheduled) {
+        publishScheduled = true;
+        requestAnimationFrame(publishLatestPose);
+      }
+    }
+  } catch (err) {
+    console.error('pose handling failed', err);
+  }
+  // pose messages do not change connection state
+  lastActivityMs = performance.now();
+}
+
+type MessageHandler = (msg: any) => void;
+
+const ignoreMessage: MessageHandler = () => {};
+const logMessageType = (prefix: string): MessageHandler => (msg) => log('info', `${prefix}: ${msg.type}`);
+
+// Sidecar messages dispatched by type: one map lookup per line instead of walking an
+// if/else chain of string compares
+const messageHandlers = new Map<string, MessageHandler>(Object.entries<MessageHandler>({
+  pose: processPose,
+  session: (msg) => {
     connectionName.set(msg.name);
     accessCode.set(msg.code);
     if (msg.transport) {
@@ -31,117 +121,118 @@ function processMessage(msg: any) {
       wifiPort.set(msg.port);
     }
     log('info', `Session: ${msg.name} / ${msg.code} (${msg.transport || 'unknown'})`);
-  } else if (msg.type === 'ble_state') {
-    // ignore detailed adapter state
-  } else if (msg.type === 'ble_service_added' || msg.type === 'ble_advertising' || msg.type === 'ble_advertising_started') {
-    log('info', `BLE: ${msg.type}`);
+  },
+  // ignore detailed adapter state
+  ble_state: ignoreMessage,
+  ble_service_added: logMessageType('BLE'),
+  ble_advertising: logMessageType('BLE'),
+  ble_advertising_started: logMessageType('BLE'),
   // New unified UDP service events (WiFi and USB use same server)
-  } else if (msg.type === 'server_starting') {
-    log('info', `Server starting on ${msg.ip}:${msg.port}`);
-  } else if (msg.type === 'server_listening') {
-    log('info', `Server listening on ${msg.ip}:${msg.port}`);
-  } else if (msg.type === 'server_stopped') {
-    log('info', 'Server stopped');
-  } else if (msg.type === 'mdns_registered') {
-    log('info', `mDNS: ${msg.service} @ ${msg.ip}:${msg.port}`);
-  } else if (msg.type === 'connected') {
+  server_starting: (msg) => log('info', `Server starting on ${msg.ip}:${msg.port}`),
+  server_listening: (msg) => log('info', `Server listening on ${msg.ip}:${msg.port}`),
+  server_stopped: () => log('info', 'Server stopped'),
+  mdns_registered: (msg) => log('info', `mDNS: ${msg.service} @ ${msg.ip}:${msg.port}`),
+  connected: (msg) => {
     // Unified connected event from UDP server (works for both WiFi and USB)
-    lastActivityMs = Date.now();
+    lastActivityMs = performance.now();
     setStatus('connected');
     log('info', `Connected: ${msg.client}`);
-  } else if (msg.type === 'disconnected') {
+  },
+  disconnected: (msg) => {
     // Unified disconnected event from UDP server
     setStatus('disconnected');
     log('info', `Disconnected: ${msg.reason || 'unknown'}`);
-  } else if (msg.type === 'session_rejected') {
-    log('warn', `Connection rejected: ${msg.reason} from ${msg.client}`);
+  },
+  session_rejected: (msg) => log('warn', `Connection rejected: ${msg.reason} from ${msg.client}`),
   // Legacy events for backward compatibility
-  } else if (msg.type === 'wifi_starting' || msg.type === 'wifi_listening') {
-    log('info', `WiFi: ${msg.type}`);
-  } else if (msg.type === 'wifi_connected') {
-    lastActivityMs = Date.now();
+  wifi_starting: logMessageType('WiFi'),
+  wifi_listening: logMessageType('WiFi'),
+  wifi_connected: (msg) => {
+    lastActivityMs = performance.now();
     setStatus('connected');
     log('info', `WiFi connected: ${msg.client}`);
-  } else if (msg.type === 'wifi_disconnected') {
+  },
+  wifi_disconnected: (msg) => {
     setStatus('disconnected');
     log('info', `WiFi disconnected: ${msg.reason}`);
-  } else if (msg.type === 'wifi_rejected') {
-    log('warn', `WiFi rejected: ${msg.reason}`);
-  } else if (msg.type === 'usb_starting' || msg.type === 'usb_listening') {
-    log('info', `USB: ${msg.type}`);
-  } else if (msg.type === 'usb_connected') {
-    lastActivityMs = Date.now();
+  },
+  wifi_rejected: (msg) => log('warn', `WiFi rejected: ${msg.reason}`),
+  usb_starting: logMessageType('USB'),
+  usb_listening: logMessageType('USB'),
+  usb_connected: (msg) => {
+    lastActivityMs = performance.now();
     setStatus('connected');
     log('info', `USB connected: ${msg.client}`);
-  } else if (msg.type === 'usb_disconnected') {
+  },
+  usb_disconnected: (msg) => {
     setStatus('disconnected');
     log('info', `USB disconnected: ${msg.reason}`);
-  } else if (msg.type === 'usb_rejected') {
-    log('warn', `USB rejected: ${msg.reason}`);
-  } else if (msg.type === 'service_heartbeat') {
-    // ignore - only for process liveness
-  } else if (msg.type === 'usb_setup_info') {
-    log('info', 'USB: Check setup requirements for iOS/Android');
-  } else if (msg.type === 'resampling_enabled') {
-    log('info', `Resampling: ${msg.upsample_to_hz}Hz (rate limit: ${msg.rate_limit_hz || 'none'})`);
-  } else if (msg.type === 'warn') {
-    log('warn', msg.message);
-  } else if (msg.type === 'error') {
-    log('error', msg.message);
-  } else if (msg.type === 'heartbeat') {
+  },
+  usb_rejected: (msg) => log('warn', `USB rejected: ${msg.reason}`),
+  // ignore - only for process liveness
+  service_heartbeat: ignoreMessage,
+  usb_setup_info: () => log('info', 'USB: Check setup requirements for iOS/Android'),
+  resampling_enabled: (msg) => log('info', `Resampling: ${msg.upsample_to_hz}Hz (rate limit: ${msg.rate_limit_hz || 'none'})`),
+  warn: (msg) => log('warn', msg.message),
+  error: (msg) => log('error', msg.message),
+  heartbeat: () => {
     // BLE connectivity heartbeat - don't log (high frequency)
-    lastActivityMs = Date.now();
+    lastActivityMs = performance.now();
     if (currentStatus !== 'connected') setStatus('connected');
-  } else if (msg.type === 'ble_auth_ok') {
-    lastActivityMs = Date.now();
+  },
+  ble_auth_ok: () => {
+    lastActivityMs = performance.now();
     setStatus('connected');
     log('info', 'BLE auth OK');
-  } else if (msg.type === 'ble_auth_failed') {
-    lastActivityMs = Date.now();
+  },
+  ble_auth_failed: () => {
+    lastActivityMs = performance.now();
     log('warn', 'BLE auth FAILED');
-  } else if (msg.type === 'ble_control') {
-    lastActivityMs = Date.now();
+  },
+  ble_control: (msg) => {
+    lastActivityMs = performance.now();
     log('info', `BLE control: ${msg.cmd}`);
-  } else if (msg.type === 'pose') {
+  },
+}));
+
+function processMessage(msg: any) {
+  messageHandlers.get(msg.type)?.(msg);
+}
+
+function processLine(line: string) {
+  // Fast path: a line normally holds exactly one JSON object, so parse it once as-is
+  // and skip the regex split below
+  let parsed = false;
+  let msg: any;
+  try {
+    msg = JSON.parse(line);
+    parsed = true;
+  } catch (_) {
+    // Concatenated objects or not JSON at all; handled below
+  }
+  if (parsed) {
     try {
-      const ai = msg.data?.absolute_input;
-      if (ai) {
-        const pose = {
-          movement_start: !!ai.movement_start,
-          x: Number(ai.x ?? 0),
-          y: Number(ai.y ?? 0),
-          z: Number(ai.z ?? 0),
-          x_rot: Number(ai.x_rot ?? 0),
-          y_rot: Number(ai.y_rot ?? 0),
-          z_rot: Number(ai.z_rot ?? 0),
-          qx: Number(ai.qx ?? 0),
-          qy: Number(ai.qy ?? 0),
-          qz: Number(ai.qz ?? 0),
-          qw: Number(ai.qw ?? 1)
-        };
-        // INPUT pose is in reference coordinate system (equals visualization world)
-        inputPose.set(pose);
-        let currentOrigin: any;
-        originPose.subscribe((v) => (currentOrigin = v))();
-        let cfg: any;
-        outputConfig.subscribe((v) => (cfg = v))();
-        if (!cfg) {
-          cfg = {
-            includeFormats: { absolute_input: true, absolute_transformed: true, delta_input: false, delta_transformed: false },
-            includeOrientation: { quaternion: true, euler_radian: false, euler_degree: false },
-            scale: 1,
-            outputAxes: { x: 1, y: 1, z: 1 }
-          };
-        }
-        const { output, newOrigin } = computeOutput(pose, cfg, currentOrigin ?? null);
-        outputJson.set(output);
-        if (newOrigin !== currentOrigin) originPose.set(newOrigin);
-      }
-    } catch (err) {
-      console.error('pose handling failed', err);
+      processMessage(msg);
+    } catch (_) {
+      // Valid JSON but not a message object
+    }
+    return;
+  }
+
+  // Handle multiple JSON objects on a single line (can happen with concurrent prints)
+  // Split on }{ which indicates concatenated JSON objects
+  const jsonStrings = line.split(/(?<=\})(?=\{)/);
+
+  for (const jsonStr of jsonStrings) {
+    const trimmed = jsonStr.trim();
+    if (!trimmed) continue;
+
+    try {
+      const msg = JSON.parse(trimmed);
+      processMessage(msg);
+    } catch (_) {
+      // Not valid JSON, skip (e.g., QR code lines)
     }
-    // pose messages do not change connection state
-    lastActivityMs = Date.now();
   }
 }
 
@@ -169,24 +260,10 @@ export async function startPythonSidecar(config: StartConfig) {
     unlistenStderr = null;
   }
   
-  unlistenStdout = await listen<string>('python-line', (e) => {
-    const line = e.payload;
-    
-    // Handle multiple JSON objects on a single line (can happen with concurrent prints)
-    // Split on }{ which indicates concatenated JSON objects
-    const jsonStrings = line.split(/(?<=\})(?=\{)/);
-    
-    for (const jsonStr of jsonStrings) {
-      const trimmed = jsonStr.trim();
-      if (!trimmed) continue;
-      
-      try {
-        const msg = JSON.parse(trimmed);
-        processMessage(msg);
-      } catch (_) {
-        // Not valid JSON, skip (e.g., QR code lines)
-      }
-    }
+  // stdout lines arrive in bursts: everything the sidecar had written when the
+  // forwarder woke up is delivered as one event
+  unlistenStdout = await listen<string[]>('python-lines', (e) => {
+    for (const line of e.payload) processLine(line);
   });
   
   unlistenStderr = await listen<string>('python-error', (e) => {
@@ -219,14 +296,8 @@ export async function startPythonSidecar(config: StartConfig) {
   }
   
   // Start inactivity watchdog: consider disconnected after 10s without activity
-  if (inactivityTimer) clearInterval(inactivityTimer);
-  inactivityTimer = setInterval(() => {
-    const age = Date.now() - lastActivityMs;
-    if (lastActivityMs === 0) return; // never connected yet
-    if (age > 10_000) {
-      if (currentStatus !== 'disconnected') setStatus('disconnected');
-    }
-  }, 1000) as unknown as number;
+  if (inactivityTimer) clearTimeout(inactivityTimer);
+  inactivityTimer = setTimeout(checkInactivity, INACTIVITY_TIMEOUT_MS) as unknown as number;
 }
 
 export async function stopPythonSidecar() {
@@ -234,7 +305,7 @@ export async function stopPythonSidecar() {
   
   // Stop inactivity timer
   if (inactivityTimer) {
-    clearInterval(inactivityTimer);
+    clearTimeout(inactivityTimer);
     inactivityTimer = null;
   }
   
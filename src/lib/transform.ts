@@ -1,17 +1,184 @@
-import * as THREE from 'three';
 import type { Pose, OutputConfig } from './types';
 
 export type OutputPayload = Record<string, unknown>;
 
+type Vec3 = { x: number; y: number; z: number };
+type Quat = { x: number; y: number; z: number; w: number };
+type EulerXYZ = { x_rot: number; y_rot: number; z_rot: number };
+
+// Scalar kernels for the rotation math computeOutput needs. They reproduce the three.js
+// (r170) formulas the pose path used to go through, but write into caller-provided
+// objects so a pose is processed without allocating Vector3/Quaternion/Euler temporaries.
+
+// Quaternion.setFromEuler with order 'XYZ'
+function eulerXYZToQuat(x: number, y: number, z: number, out: Quat): Quat {
+  const c1 = Math.cos(x / 2);
+  const c2 = Math.cos(y / 2);
+  const c3 = Math.cos(z / 2);
+  const s1 = Math.sin(x / 2);
+  const s2 = Math.sin(y / 2);
+  const s3 = Math.sin(z / 2);
+  // The first two factors of every term come from four shared products, grouped
+  // exactly as the three.js expressions are evaluated, so the result is unchanged
+  const a = c1 * c2;
+  const b = s1 * s2;
+  const c = c1 * s2;
+  const d = s1 * c2;
+  out.x = d * c3 + c * s3;
+  out.y = c * c3 - d * s3;
+  out.z = a * s3 + b * c3;
+  out.w = a * c3 - b * s3;
+  return out;
+}
+
+// out = a * b (Quaternion.multiplyQuaternions); out may alias a or b
+function quatMultiply(
+  ax: number, ay: number, az: number, aw: number,
+  bx: number, by: number, bz: number, bw: number,
+  out: Quat
+): Quat {
+  out.x = ax * bw + aw * bx + ay * bz - az * by;
+  out.y = ay * bw + aw * by + az * bx - ax * bz;
+  out.z = az * bw + aw * bz + ax * by - ay * bx;
+  out.w = aw * bw - ax * bx - ay * by - az * bz;
+  return out;
+}
+
+// diag(sx, sy, sz) * R(q) as a row-major 3x3 matrix, with R(q) built like three.js's
+// Matrix4.makeRotationFromQuaternion. Applying it is Vector3.applyQuaternion followed by
+// the per-axis output scale, folded into one matrix-vector product.
+function scaledRotationMatrix(q: Quat, sx: number, sy: number, sz: number): number[] {
+  const x2 = q.x + q.x, y2 = q.y + q.y, z2 = q.z + q.z;
+  const xx = q.x * x2, xy = q.x * y2, xz = q.x * z2;
+  const yy = q.y * y2, yz = q.y * z2, zz = q.z * z2;
+  const wx = q.w * x2, wy = q.w * y2, wz = q.w * z2;
+  return [
+    (1 - (yy + zz)) * sx, (xy - wz) * sx, (xz + wy) * sx,
+    (xy + wz) * sy, (1 - (xx + zz)) * sy, (yz - wx) * sy,
+    (xz - wy) * sz, (yz + wx) * sz, (1 - (xx + yy)) * sz,
+  ];
+}
+
+// Euler.setFromQuaternion with order 'XYZ', going through the same rotation matrix
+// entries and gimbal-lock threshold as three.js
+function quatToEulerXYZ(x: number, y: number, z: number, w: number, out: EulerXYZ): EulerXYZ {
+  const x2 = x + x, y2 = y + y, z2 = z + z;
+  const xx = x * x2, xy = x * y2, xz = x * z2;
+  const yy = y * y2, yz = y * z2, zz = z * z2;
+  const wx = w * x2, wy = w * y2, wz = w * z2;
+  const m11 = 1 - (yy + zz);
+  const m12 = xy - wz;
+  const m13 = xz + wy;
+  const m22 = 1 - (xx + zz);
+  const m23 = yz - wx;
+  const m32 = yz + wx;
+  const m33 = 1 - (xx + yy);
+  out.y_rot = Math.asin(Math.max(-1, Math.min(1, m13)));
+  if (Math.abs(m13) < 0.9999999) {
+    out.x_rot = Math.atan2(-m23, m33);
+    out.z_rot = Math.atan2(-m12, m11);
+  } else {
+    out.x_rot = Math.atan2(m32, m22);
+    out.z_rot = 0;
+  }
+  return out;
+}
+
+export function eulerRadiansToQuaternion(e: EulerXYZ) {
+  const q = eulerXYZToQuat(e.x_rot, e.y_rot, e.z_rot, { x: 0, y: 0, z: 0, w: 1 });
+  return { qx: q.x, qy: q.y, qz: q.z, qw: q.w };
+}
+
 export function quaternionToEulerRadians(q: { qx: number; qy: number; qz: number; qw: number }) {
-  const quat = new THREE.Quaternion(q.qx, q.qy, q.qz, q.qw);
-  const euler = new THREE.Euler().setFromQuaternion(quat, 'XYZ');
-  return { x_rot: euler.x, y_rot: euler.y, z_rot: euler.z };
+  return quatToEulerXYZ(q.qx, q.qy, q.qz, q.qw, { x_rot: 0, y_rot: 0, z_rot: 0 });
+}
+
+const RAD_TO_DEG = 180 / Math.PI;
+
+export function radiansToDegrees(e: EulerXYZ) {
+  return { x_rot: e.x_rot * RAD_TO_DEG, y_rot: e.y_rot * RAD_TO_DEG, z_rot: e.z_rot * RAD_TO_DEG };
 }
 
-export function radiansToDegrees(e: { x_rot: number; y_rot: number; z_rot: number }) {
-  const r2d = 180 / Math.PI;
-  return { x_rot: e.x_rot * r2d, y_rot: e.y_rot * r2d, z_rot: e.z_rot * r2d };
+// Values that only depend on the output config, derived once per config object instead of
+// once per pose. The output settings panel publishes a fresh config object on every edit,
+// so a cached entry can never go stale.
+type PreparedConfig = {
+  // Per-axis output factor (axis sign times scale)
+  sx: number;
+  sy: number;
+  sz: number;
+  // Inverse target-frame rotation, and the same rotation with the axis factors folded in
+  // as a row-major 3x3 matrix; both null without a (non-identity) target frame
+  invTargetQuat: Quat | null;
+  targetMatrix: number[] | null;
+};
+
+const preparedConfigs = new WeakMap<OutputConfig, PreparedConfig>();
+
+function prepareConfig(config: OutputConfig): PreparedConfig {
+  let prepared = preparedConfigs.get(config);
+  if (!prepared) {
+    const scale = config.scale ?? 1;
+    const ax = config.outputAxes;
+    let invTargetQuat: Quat | null = null;
+    const tf = config.targetFrame;
+    // The settings panel always sends a targetFrame, all zeros until the user edits it. An
+    // identity frame is treated like no frame so those poses skip the rotation entirely.
+    const isIdentity = !!tf && tf.x === 0 && tf.y === 0 && tf.z === 0 && tf.x_rot === 0 && tf.y_rot === 0 && tf.z_rot === 0;
+    if (tf && !isIdentity) {
+      invTargetQuat = eulerXYZToQuat(tf.x_rot, tf.y_rot, tf.z_rot, { x: 0, y: 0, z: 0, w: 1 });
+      // Inverse of a unit quaternion is its conjugate (Quaternion.invert)
+      invTargetQuat.x = -invTargetQuat.x;
+      invTargetQuat.y = -invTargetQuat.y;
+      invTargetQuat.z = -invTargetQuat.z;
+    }
+    const sx = ax ? ax.x * scale : scale;
+    const sy = ax ? ax.y * scale : scale;
+    const sz = ax ? ax.z * scale : scale;
+    prepared = {
+      sx,
+      sy,
+      sz,
+      invTargetQuat,
+      targetMatrix: invTargetQuat ? scaledRotationMatrix(invTargetQuat, sx, sy, sz) : null,
+    };
+    preparedConfigs.set(config, prepared);
+  }
+  return prepared;
+}
+
+// Scratch values reused by every computeOutput call; their fields are copied into the
+// output records, never referenced from them
+const eulerRad: EulerXYZ = { x_rot: 0, y_rot: 0, z_rot: 0 };
+const eulerDeg: EulerXYZ = { x_rot: 0, y_rot: 0, z_rot: 0 };
+const targetSpaceQuat: Quat = { x: 0, y: 0, z: 0, w: 1 };
+const transformedPos: Vec3 = { x: 0, y: 0, z: 0 };
+
+// Write the selected orientation representations onto an output record in place,
+// rather than allocating a temporary object per representation for Object.assign.
+function writeOrientation(
+  target: Record<string, unknown>,
+  includeOri: OutputConfig['includeOrientation'],
+  qx: number, qy: number, qz: number, qw: number,
+  er: EulerXYZ,
+  ed: EulerXYZ
+) {
+  if (includeOri.quaternion) {
+    target.qx = qx;
+    target.qy = qy;
+    target.qz = qz;
+    target.qw = qw;
+  }
+  if (includeOri.euler_radian) {
+    target.x_rot = er.x_rot;
+    target.y_rot = er.y_rot;
+    target.z_rot = er.z_rot;
+  }
+  if (includeOri.euler_degree) {
+    target.x_rot_deg = ed.x_rot;
+    target.y_rot_deg = ed.y_rot;
+    target.z_rot_deg = ed.z_rot;
+  }
 }
 
 // INPUT pose values are expressed in the reference coordinate system defined by the
@@ -27,78 +194,101 @@ export function computeOutput(
   // to this first frame, regardless of whether an origin already exists.
   let newOrigin = pose.movement_start ? { ...pose } : origin;
 
+  // Read the pose fields once; everything below works on locals
+  const { x, y, z, qx, qy, qz, qw } = pose;
+
   const include = config.includeFormats;
   const includeOri = config.includeOrientation;
 
-  const absolute_input: Record<string, unknown> = {
-    movement_start: pose.movement_start,
-    x: pose.x,
-    y: pose.y,
-    z: pose.z,
-  };
-  const er = quaternionToEulerRadians(pose);
-  const ed = radiansToDegrees(er);
-  if (includeOri.quaternion) Object.assign(absolute_input, { qx: pose.qx, qy: pose.qy, qz: pose.qz, qw: pose.qw });
-  if (includeOri.euler_radian) Object.assign(absolute_input, { x_rot: er.x_rot, y_rot: er.y_rot, z_rot: er.z_rot });
-  if (includeOri.euler_degree) Object.assign(absolute_input, { x_rot_deg: ed.x_rot, y_rot_deg: ed.y_rot, z_rot_deg: ed.z_rot });
-
-  const scale = config.scale ?? 1;
-  const ax = config.outputAxes ?? { x: 1, y: 1, z: 1 };
-  const transformPos = (p: { x: number; y: number; z: number }) => ({
-    x: p.x * ax.x * scale,
-    y: p.y * ax.y * scale,
-    z: p.z * ax.z * scale,
-  });
-
-  // Apply target frame transform (reference -> target) if provided
-  // Target pose T (position t, rotation qT). To express a reference pose P in target coords:
-  // p_rel = R_T^T * (p_ref - t), q_rel = qT^{-1} * q_ref
-  const refPos = new THREE.Vector3(pose.x, pose.y, pose.z);
-  const refQuat = new THREE.Quaternion(pose.qx, pose.qy, pose.qz, pose.qw);
-  let targetSpacePos = refPos.clone();
-  let targetSpaceQuat = refQuat.clone();
-  if (config.targetFrame) {
-    const tPos = new THREE.Vector3(config.targetFrame.x, config.targetFrame.y, config.targetFrame.z);
-    const tEuler = new THREE.Euler(config.targetFrame.x_rot, config.targetFrame.y_rot, config.targetFrame.z_rot, 'XYZ');
-    const tQuat = new THREE.Quaternion().setFromEuler(tEuler);
-    const invTQuat = tQuat.clone().invert();
-    targetSpacePos.sub(tPos).applyQuaternion(invTQuat);
-    targetSpaceQuat.premultiply(invTQuat);
+  // Euler angles are only derived when an Euler representation is requested; every
+  // output variant reuses the same values. writeOrientation ignores them otherwise.
+  const er = eulerRad;
+  const ed = eulerDeg;
+  if (includeOri.euler_radian || includeOri.euler_degree) {
+    quatToEulerXYZ(qx, qy, qz, qw, er);
+    if (includeOri.euler_degree) {
+      ed.x_rot = er.x_rot * RAD_TO_DEG;
+      ed.y_rot = er.y_rot * RAD_TO_DEG;
+      ed.z_rot = er.z_rot * RAD_TO_DEG;
+    }
   }
 
-  const absolute_transformed: Record<string, unknown> = {
-    ...transformPos({ x: targetSpacePos.x, y: targetSpacePos.y, z: targetSpacePos.z }),
-  };
-  if (includeOri.quaternion) Object.assign(absolute_transformed, { qx: targetSpaceQuat.x, qy: targetSpaceQuat.y, qz: targetSpaceQuat.z, qw: targetSpaceQuat.w });
-  if (includeOri.euler_radian) Object.assign(absolute_transformed, { x_rot: er.x_rot, y_rot: er.y_rot, z_rot: er.z_rot });
-  if (includeOri.euler_degree) Object.assign(absolute_transformed, { x_rot_deg: ed.x_rot, y_rot_deg: ed.y_rot, z_rot_deg: ed.z_rot });
-
+  // Each output variant is only built when it is requested, and the target-frame and
+  // delta math only runs for the variants that need it
   const output: OutputPayload = {};
-  if (include.absolute_input) output.absolute_input = absolute_input;
-  if (include.absolute_transformed) output.absolute_transformed = absolute_transformed;
+  if (include.absolute_input) {
+    const absolute_input: Record<string, unknown> = {
+      movement_start: pose.movement_start,
+      x,
+      y,
+      z,
+    };
+    writeOrientation(absolute_input, includeOri, qx, qy, qz, qw, er, ed);
+    output.absolute_input = absolute_input;
+  }
 
-  if (newOrigin) {
-    const delta_input: Record<string, unknown> = {
-      dx: pose.x - newOrigin.x,
-      dy: pose.y - newOrigin.y,
-      dz: pose.z - newOrigin.z,
+  // Common case: only the raw input is requested, so skip the target-frame and delta math.
+  // The origin above is still tracked so deltas are correct once they are switched on.
+  if (!include.absolute_transformed && !include.delta_input && !include.delta_transformed) {
+    return { output, newOrigin };
+  }
+
+  const { sx, sy, sz, invTargetQuat, targetMatrix } = prepareConfig(config);
+
+  if (include.absolute_transformed || include.delta_transformed) {
+    // Apply target frame transform (reference -> target) if provided
+    // Target pose T (position t, rotation qT). To express a reference pose P in target coords:
+    // p_rel = R_T^T * (p_ref - t), q_rel = qT^{-1} * q_ref
+    // The target-space position is produced already scaled for output
+    const tf = config.targetFrame;
+    if (tf && invTargetQuat && targetMatrix) {
+      const px = x - tf.x;
+      const py = y - tf.y;
+      const pz = z - tf.z;
+      const m = targetMatrix;
+      transformedPos.x = m[0] * px + m[1] * py + m[2] * pz;
+      transformedPos.y = m[3] * px + m[4] * py + m[5] * pz;
+      transformedPos.z = m[6] * px + m[7] * py + m[8] * pz;
+      const iq = invTargetQuat;
+      quatMultiply(iq.x, iq.y, iq.z, iq.w, qx, qy, qz, qw, targetSpaceQuat);
+    } else {
+      transformedPos.x = x * sx;
+      transformedPos.y = y * sy;
+      transformedPos.z = z * sz;
+      targetSpaceQuat.x = qx;
+      targetSpaceQuat.y = qy;
+      targetSpaceQuat.z = qz;
+      targetSpaceQuat.w = qw;
+    }
+  }
+
+  if (include.absolute_transformed) {
+    const absolute_transformed: Record<string, unknown> = {
+      x: transformedPos.x,
+      y: transformedPos.y,
+      z: transformedPos.z,
     };
-    // Orientation for delta_*: include current orientation (not a delta), per UI expectation
-    if (includeOri.quaternion) Object.assign(delta_input, { qx: pose.qx, qy: pose.qy, qz: pose.qz, qw: pose.qw });
-    if (includeOri.euler_radian) Object.assign(delta_input, { x_rot: er.x_rot, y_rot: er.y_rot, z_rot: er.z_rot });
-    if (includeOri.euler_degree) Object.assign(delta_input, { x_rot_deg: ed.x_rot, y_rot_deg: ed.y_rot, z_rot_deg: ed.z_rot });
-
-    // Delta in target coordinates uses same linear transform (rotation cancels when subtracting origin in reference then rotating)
-    const dtPos = transformPos({ x: (delta_input.dx as number), y: (delta_input.dy as number), z: (delta_input.dz as number) });
-    const delta_transformed: Record<string, unknown> = { ...dtPos };
-    if (includeOri.quaternion) Object.assign(delta_transformed, { qx: targetSpaceQuat.x, qy: targetSpaceQuat.y, qz: targetSpaceQuat.z, qw: targetSpaceQuat.w });
-    if (includeOri.euler_radian) Object.assign(delta_transformed, { x_rot: er.x_rot, y_rot: er.y_rot, z_rot: er.z_rot });
-    if (includeOri.euler_degree) Object.assign(delta_transformed, { x_rot_deg: ed.x_rot, y_rot_deg: ed.y_rot, z_rot_deg: ed.z_rot });
-    if (include.delta_input) output.delta_input = delta_input;
-    if (include.delta_transformed) output.delta_transformed = delta_transformed;
+    writeOrientation(absolute_transformed, includeOri, targetSpaceQuat.x, targetSpaceQuat.y, targetSpaceQuat.z, targetSpaceQuat.w, er, ed);
+    output.absolute_transformed = absolute_transformed;
+  }
+
+  if (newOrigin) {
+    const dx = x - newOrigin.x;
+    const dy = y - newOrigin.y;
+    const dz = z - newOrigin.z;
+    if (include.delta_input) {
+      const delta_input: Record<string, unknown> = { dx, dy, dz };
+      // Orientation for delta_*: include current orientation (not a delta), per UI expectation
+      writeOrientation(delta_input, includeOri, qx, qy, qz, qw, er, ed);
+      output.delta_input = delta_input;
+    }
+    if (include.delta_transformed) {
+      // Delta in target coordinates uses same linear transform (rotation cancels when subtracting origin in reference then rotating)
+      const delta_transformed: Record<string, unknown> = { x: dx * sx, y: dy * sy, z: dz * sz };
+      writeOrientation(delta_transformed, includeOri, targetSpaceQuat.x, targetSpaceQuat.y, targetSpaceQuat.z, targetSpaceQuat.w, er, ed);
+      output.delta_transformed = delta_transformed;
+    }
   }
 
   return { output, newOrigin };
 }
-
-